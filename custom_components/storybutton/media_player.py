@@ -1,22 +1,29 @@
 """Platform for Storybutton integration."""
 
+import asyncio
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
 
 from homeassistant.components.media_player import MediaPlayerEntity
 from homeassistant.components.media_player.const import MediaPlayerEntityFeature
 from homeassistant.const import (
     CONF_HOST,
     CONF_NAME,
+    EVENT_HOMEASSISTANT_STOP,
     STATE_IDLE,
     STATE_OFF,
     STATE_ON,
     STATE_PAUSED,
     STATE_PLAYING,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant, callback
 from homeassistant.helpers.typing import ConfigType
 
 from custom_components.storybutton.storybutton import (
+    Snapshot,
     State,
     Storybutton,
     StorybuttonConfig,
@@ -24,6 +31,18 @@ from custom_components.storybutton.storybutton import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# HA calls async_update at this rate; the entity skips polls to follow the
+# slower, state-dependent cadence below.
+SCAN_INTERVAL = timedelta(seconds=5)
+
+POLL_INTERVAL_PLAYING = 5
+POLL_INTERVAL_DEFAULT = 10
+POLL_INTERVAL_MAX = 300
+
+# Seconds after a command during which polls keep the optimistic state, since
+# playing.php takes a moment to reflect the change.
+COMMAND_SETTLE_TIME = 2.0
+
 
 async def async_setup_platform(
     hass: HomeAssistant, config, async_add_entities, discovery_info=None
@@ -65,6 +84,9 @@ class StoryButtonEntity(MediaPlayerEntity):
         self._state = STATE_OFF
         self._attr_volume_level = 0
         self._attr_media_title = ""
+        self._poll_interval = POLL_INTERVAL_DEFAULT
+        self._next_poll_at = 0.0
+        self._last_command_at = 0.0
         self._supported_features = (
             MediaPlayerEntityFeature.PLAY
             | MediaPlayerEntityFeature.PAUSE
@@ -73,7 +95,14 @@ class StoryButtonEntity(MediaPlayerEntity):
             | MediaPlayerEntityFeature.VOLUME_MUTE
         )
 
-        self.sb_device = Storybutton(StorybuttonConfig(self._host))
+        # Created off the event loop on first use, see `_async_ensure_device`.
+        self.sb_device: Optional[Storybutton] = None
+        self._device_lock = asyncio.Lock()
+        # A single worker of our own keeps a slow or offline Storybutton from
+        # holding slots in HA's shared executor, and serializes requests to a
+        # device that can't handle concurrent SOAP calls anyway. Started on
+        # demand, see `_async_run`.
+        self._executor: Optional[ThreadPoolExecutor] = None
 
     @property
     def name(self):
@@ -90,95 +119,188 @@ class StoryButtonEntity(MediaPlayerEntity):
         """Flag media player features that are supported."""
         return self._supported_features
 
+    def _async_run(self, target, *args) -> asyncio.Future:
+        """Run a blocking device call on this entity's worker thread."""
+        if self._executor is None:
+            # update_before_add polls before async_added_to_hass, and HA re-adds
+            # this same object after it was removed (e.g. on an entity_id
+            # rename), so the worker is (re)started whenever it's needed.
+            self._executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"storybutton-{self._host}"
+            )
+        return self.hass.loop.run_in_executor(self._executor, target, *args)
+
+    async def _async_ensure_device(self) -> Storybutton:
+        """Create the device client on the worker thread if it doesn't exist yet."""
+        async with self._device_lock:
+            if self.sb_device is None:
+                self.sb_device = await self._async_run(
+                    lambda: Storybutton(StorybuttonConfig(self._host))
+                )
+        return self.sb_device
+
+    async def async_added_to_hass(self):
+        """Set up the device client."""
+        # HA doesn't remove entities when it stops, and an idle worker would
+        # otherwise hold up its exit until the thread join times out.
+        self.async_on_remove(
+            self.hass.bus.async_listen_once(
+                EVENT_HOMEASSISTANT_STOP, self._async_stop_worker
+            )
+        )
+        await self._async_ensure_device()
+
+    async def _async_fetch_name(self) -> None:
+        """Look up the device's friendly name, if none was configured."""
+        try:
+            self._name = await self._async_run(self.sb_device.name)
+        except Exception as exception_instance:  # pylint: disable=broad-except
+            _LOGGER.warning("Unable to fetch Storybutton name: %s", exception_instance)
+
+    async def async_will_remove_from_hass(self):
+        """Stop the worker thread when the entity is removed."""
+        self._async_stop_worker()
+
+    @callback
+    def _async_stop_worker(self, _event: Event | None = None) -> None:
+        """Stop the worker thread, dropping any queued device calls."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
     async def async_update(self):
         """Fetch new state data for the media player.
 
-
-        This is where you can query your device using REST (or other protocols)
-        and update the internal state accordingly.
+        Polls every 5s while playing and every 10s otherwise. While the device
+        is unreachable the interval doubles up to 5 minutes, so a switched-off
+        Storybutton doesn't tie up a worker waiting on timeouts every poll.
         """
-        # Example (pseudo-code):
-        # response = await your_async_http_get(f"http://{self._host}/status")
-        # self._state = parse_state_from_response(response)
-        _LOGGER.debug("Updating state for %s", self._name)
-        # For now, we’ll just simulate a state update:
-        self._state = STATE_IDLE
+        if time.monotonic() - self._last_command_at < COMMAND_SETTLE_TIME:
+            # Keep the optimistic state; the next poll will reconcile
+            return
 
-        if not await self.hass.async_add_executor_job(self.sb_device.get_power_status):
-            self._state = STATE_OFF
+        if time.monotonic() < self._next_poll_at:
             return
 
-        self._state = STATE_ON
+        _LOGGER.debug("Updating state for %s", self._name)
+        # update_before_add polls before async_added_to_hass has run
+        await self._async_ensure_device()
+        started_at = time.monotonic()
+        snapshot = await self._async_fetch_snapshot()
+        if self._name is None and snapshot is not None and snapshot.power:
+            # Only until it succeeds, and in time for update_before_add so the
+            # entity_id is derived from the device's name.
+            await self._async_fetch_name()
+        if self._last_command_at > started_at:
+            # A command was sent while we were polling, so this may predate it
+            return
+        self._update_state(snapshot)
+        # Measured from the start of this poll, less half a tick, so the HA
+        # tick that lands on the interval isn't skipped for arriving a few
+        # milliseconds early relative to when the previous poll finished.
+        self._next_poll_at = (
+            started_at + self._poll_interval - SCAN_INTERVAL.total_seconds() / 2
+        )
 
-        # Retrieve latest data
+    async def _async_fetch_snapshot(self) -> Snapshot | None:
+        """Fetch a snapshot of the device, or None if it couldn't be read."""
         # Note that when SB changes episodes, there's a delay for some reason
         # So I think I need to increase the timeout of the `status` call
         # Or t least let it handle more than 1 failure :)
         try:
-            await self.async_update_media_title()
-            await self.async_update_volume()
-            if self._name is None:
-                self._name = self.sb_device.name()
-            status = await self.hass.async_add_executor_job(self.sb_device.status)
-            if status == State.PLAYING:
-                self._state = STATE_PLAYING
-            elif status == State.PAUSED:
-                self._state = STATE_PAUSED
+            # One executor job per poll: playing.php doubles as the power check
+            # and GetVolume is only issued when the device is reachable.
+            return await self._async_run(self.sb_device.snapshot)
         except Exception as exception_instance:  # pylint: disable=broad-except
             # TODO: Remove this or handle the NewConnectionError(urllib3.connection.HTTPConnection object) as this may be expected
             _LOGGER.error(exception_instance)
+            return None
+
+    def _update_state(self, snapshot: Snapshot | None) -> None:
+        """Apply a snapshot to the entity and pick the next poll interval."""
+        if snapshot is None or not snapshot.power:
             self._state = STATE_OFF
+            self._poll_interval = min(self._poll_interval * 2, POLL_INTERVAL_MAX)
+            return
+
+        self._attr_media_title = snapshot.title
+        self._attr_volume_level = snapshot.volume / 100
+        if snapshot.state == State.PLAYING:
+            self._state = STATE_PLAYING
+            self._poll_interval = POLL_INTERVAL_PLAYING
+            return
+
+        self._state = STATE_PAUSED if snapshot.state == State.PAUSED else STATE_ON
+        self._poll_interval = POLL_INTERVAL_DEFAULT
+
+    def _command_sent(self) -> None:
+        """Record a successful command.
+
+        The device just answered, so any offline backoff is over: the first
+        poll after COMMAND_SETTLE_TIME runs and reconciles the optimistic state.
+        """
+        self._last_command_at = time.monotonic()
+        self._poll_interval = POLL_INTERVAL_DEFAULT
+        self._next_poll_at = 0.0
 
     async def async_media_play(self):
         """Send play command to media player."""
-        await self.hass.async_add_executor_job(self.sb_device.play)
+        if self.sb_device is None:
+            return
+        await self._async_run(self.sb_device.play)
         self._state = STATE_PLAYING
+        self._command_sent()
 
     async def async_media_pause(self):
         """Send pause command to media player."""
-        await self.hass.async_add_executor_job(self.sb_device.pause)
+        if self.sb_device is None:
+            return
+        await self._async_run(self.sb_device.pause)
         self._state = STATE_PAUSED
+        self._command_sent()
 
     async def async_media_stop(self):
         """Send stop command to media player."""
-        await self.hass.async_add_executor_job(self.sb_device.pause)
+        if self.sb_device is None:
+            return
+        await self._async_run(self.sb_device.pause)
         self._state = STATE_IDLE
+        self._command_sent()
 
-    async def async_update_volume(self):
+    async def async_volume_up(self):
+        """Send volume up command."""
+        if self.sb_device is None:
+            return
         self._attr_volume_level = (
-            await self.hass.async_add_executor_job(self.sb_device.get_volume)
+            await self._async_run(self.sb_device.volume_up)
         ) / 100
-        _LOGGER.debug(self._attr_volume_level)
-
-    async def async_volume_up(self):
-        """Send stop command."""
-        self._attr_volume_level = await self.hass.async_add_executor_job(
-            self.sb_device.volume_up
-        )
+        self._command_sent()
 
     async def async_volume_down(self):
-        """Send stop command."""
-        self._attr_volume_level = await self.hass.async_add_executor_job(
-            self.sb_device.volume_down
-        )
+        """Send volume down command."""
+        if self.sb_device is None:
+            return
+        self._attr_volume_level = (
+            await self._async_run(self.sb_device.volume_down)
+        ) / 100
+        self._command_sent()
 
     async def async_set_volume_level(self, volume):
         """Send set volume command."""
-        await self.hass.async_add_executor_job(
-            self.sb_device.set_volume, int(volume * 100)
-        )
+        if self.sb_device is None:
+            return
+        await self._async_run(self.sb_device.set_volume, int(volume * 100))
+        self._attr_volume_level = volume
+        self._command_sent()
 
     async def async_mute_volume(self, mute):
         """Send mute command."""
+        if self.sb_device is None:
+            return
         if mute:
-            await self.hass.async_add_executor_job(self.sb_device.mute)
+            await self._async_run(self.sb_device.mute)
             self._attr_is_volume_muted = True
         else:
-            await self.hass.async_add_executor_job(self.sb_device.unmute)
+            await self._async_run(self.sb_device.unmute)
             self._attr_is_volume_muted = False
-
-    async def async_update_media_title(self):
-        self._attr_media_title = await self.hass.async_add_executor_job(
-            self.sb_device.title
-        )
-        _LOGGER.debug(self._attr_media_title)
+        self._command_sent()
@@ -1,9 +1,15 @@
-from dataclasses import dataclass
+import socket
+import time
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Callable, Optional
+from types import MappingProxyType
+from typing import Any, Callable, Mapping, Optional
 
+import orjson
 import requests
 import upnpclient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 
 class State(Enum):
@@ -14,13 +20,109 @@ class State(Enum):
     PAUSED = 4
 
 
+_STATE_API_MAP: Mapping[str, State] = MappingProxyType(
+    {"paused": State.PAUSED, "playing": State.PLAYING}
+)
+_STATE_UPNP_MAP: Mapping[str, State] = MappingProxyType(
+    {"PAUSED_PLAYBACK": State.PAUSED, "PLAYING": State.PLAYING}
+)
+
+_AV_TRANSPORT = "urn:schemas-upnp-org:service:AVTransport:1"
+_RENDERING_CONTROL = "urn:schemas-upnp-org:service:RenderingControl:1"
+
+
+def _soap_envelope(service_type: str, action: str, args: str) -> str:
+    """Wrap a UPnP action and its (already serialized) arguments for SOAP."""
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>'
+        '<s:Envelope xmlns:s="http://schemas.xmlsoap.org/soap/envelope/"'
+        ' s:encodingStyle="http://schemas.xmlsoap.org/soap/encoding/">'
+        f'<s:Body><u:{action} xmlns:u="{service_type}">{args}</u:{action}>'
+        "</s:Body></s:Envelope>"
+    )
+
+
+def _soap_headers(service_type: str, action: str) -> Mapping[str, str]:
+    """Headers for a SOAP request to a UPnP action."""
+    return MappingProxyType(
+        {
+            "Content-Type": 'text/xml; charset="utf-8"',
+            "SOAPAction": f'"{service_type}#{action}"',
+        }
+    )
+
+
+# The write-only actions we send have fixed arguments, so their envelopes are
+# built once here; only the volume and mute values are filled in per call.
+_PLAY_ENVELOPE = _soap_envelope(
+    _AV_TRANSPORT, "Play", "<InstanceID>0</InstanceID><Speed>1</Speed>"
+).encode()
+_PAUSE_ENVELOPE = _soap_envelope(
+    _AV_TRANSPORT, "Pause", "<InstanceID>0</InstanceID>"
+).encode()
+_SET_VOLUME_ENVELOPE = _soap_envelope(
+    _RENDERING_CONTROL,
+    "SetVolume",
+    "<InstanceID>0</InstanceID><Channel>Master</Channel>"
+    "<DesiredVolume>{volume}</DesiredVolume>",
+)
+_SET_MUTE_ENVELOPE = _soap_envelope(
+    _RENDERING_CONTROL,
+    "SetMute",
+    "<InstanceID>0</InstanceID><Channel>Master</Channel>"
+    "<DesiredMute>{mute}</DesiredMute>",
+)
+
+_PLAY_HEADERS = _soap_headers(_AV_TRANSPORT, "Play")
+_PAUSE_HEADERS = _soap_headers(_AV_TRANSPORT, "Pause")
+_SET_VOLUME_HEADERS = _soap_headers(_RENDERING_CONTROL, "SetVolume")
+_SET_MUTE_HEADERS = _soap_headers(_RENDERING_CONTROL, "SetMute")
+
+
+@dataclass
+class Snapshot:
+    """Point-in-time view of the device, gathered in a single poll."""
+
+    power: bool
+    state: State
+    title: str = ""
+    volume: Optional[int] = None
+
+
+def _make_session() -> requests.sessions.Session:
+    """
+    Build a keep-alive HTTP session sized for a single device.
+
+    One pooled connection is reused across polls, so each request skips the
+    TCP handshake. Idempotent GETs get a single quick retry on gateway errors.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=2,
+        max_retries=Retry(
+            total=1,
+            backoff_factor=0.2,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset(["GET"]),
+        ),
+    )
+    session.mount("http://", adapter)
+    session.headers["Connection"] = "keep-alive"
+    return session
+
+
 @dataclass
 class StorybuttonConfig:
     """Configuration for Storybutton instance."""
 
     host: str
     request_timeout: int = 3
-    http_client: requests.sessions.Session = requests.Session()
+    connect_timeout: float = 1.0
+    probe_timeout: float = 0.5
+    upnp_ttl: float = 3600
+    repeat_window: float = 1.0
+    http_client: requests.sessions.Session = field(default_factory=_make_session)
     upnp_factory: Callable[[str], upnpclient.Device] = upnpclient.Device
 
 
@@ -36,47 +138,168 @@ class Storybutton:
         """
         self._config = config
         self._endpoint = f"http://{config.host}"
+        self._playing_url = f"{self._endpoint}/php/playing.php"
+        self._device_xml_url = f"{self._endpoint}/device.xml"
         self._upnp_client: Optional[upnpclient.upnp.Device] = None
+        self._upnp_created_at = 0.0
+        self._control_urls: dict[str, str] = {}
+        # (when, value) of the last volume/mute state seen or sent
+        self._last_volume: tuple[float, Optional[int]] = (0.0, None)
+        self._last_mute: tuple[float, Optional[bool]] = (0.0, None)
+        self._cached_name: Optional[str] = None
+        self._name_refreshed_at = 0.0
         self._http_client = config.http_client
+        self._timeout = (config.connect_timeout, config.request_timeout)
 
     @property
     def upnp_client(self) -> upnpclient.Device:
         """
         Lazy initialization of UPnP client.
 
+        Building the client fetches and parses device.xml and every SCPD it
+        references, so it is kept for `upnp_ttl` seconds and only rebuilt
+        early when a UPnP call fails.
+
         Returns:
             UPnPDevice: The initialized UPnP client
         """
-        if not self._upnp_client:
-            self._upnp_client = self._config.upnp_factory(
-                f"{self._endpoint}/device.xml"
-            )
+        now = time.monotonic()
+        if (
+            not self._upnp_client
+            or now - self._upnp_created_at > self._config.upnp_ttl
+        ):
+            self._drop_upnp_client()
+            self._upnp_client = self._config.upnp_factory(self._device_xml_url)
+            self._upnp_created_at = now
         return self._upnp_client
 
+    def _invoke_upnp(self, service: str, action: str, **kwargs) -> Any:
+        """
+        Call a UPnP action, dropping the cached client if the call fails.
+
+        Args:
+            service: Service name, e.g. "RenderingControl"
+            action: Action name, e.g. "GetVolume"
+            **kwargs: Arguments for the action
+
+        Returns:
+            dict: The action's output arguments
+        """
+        try:
+            return getattr(getattr(self.upnp_client, service), action)(**kwargs)
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            upnpclient.soap.SOAPError,
+        ):
+            self._drop_upnp_client()
+            raise
+
+    def _send_soap(
+        self, service: str, action: str, envelope: bytes, headers: Mapping[str, str]
+    ) -> None:
+        """
+        POST a pre-built SOAP envelope to the action's control URL.
+
+        The control URL is looked up through the UPnP client once and then
+        cached, so these calls skip upnpclient's per-call argument validation
+        and XML construction and reuse the keep-alive HTTP session.
+
+        Args:
+            service: Service name, e.g. "RenderingControl"
+            action: Action name, e.g. "SetVolume"
+            envelope: Encoded SOAP request body
+            headers: SOAP request headers
+        """
+        try:
+            url = self._control_urls.get(action)
+            if url is None:
+                url = getattr(getattr(self.upnp_client, service), action).url
+                self._control_urls[action] = url
+            resp = self._http_client.post(
+                url, data=envelope, headers=headers, timeout=self._timeout
+            )
+            resp.raise_for_status()
+        except (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+            requests.exceptions.HTTPError,
+        ):
+            self._drop_upnp_client()
+            raise
+
+    def _drop_upnp_client(self) -> None:
+        """Forget the UPnP client and anything learned through it."""
+        self._upnp_client = None
+        self._control_urls.clear()
+        self._last_volume = (0.0, None)
+        self._last_mute = (0.0, None)
+
+    def _is_repeat(self, last: tuple[float, Any], value: Any) -> bool:
+        """Whether `value` was already seen or sent within `repeat_window`."""
+        seen_at, seen = last
+        return (
+            seen == value
+            and time.monotonic() - seen_at < self._config.repeat_window
+        )
+
     def get_power_status(self) -> bool:
         """
-        Check if the device is powered on and responding.
+        Check if the device is powered on and accepting connections.
+
+        A bare TCP connect is enough to answer this, and fails fast when the
+        device is off instead of waiting out a full HTTP request timeout.
+
+        The entity's polls don't use this; `snapshot()` learns the same thing
+        from its playing.php request.
 
         Returns:
             bool: True if device is responding, False otherwise
         """
         try:
-            self._http_client.get(self._endpoint, timeout=self._config.request_timeout)
-            return True
-        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            with socket.create_connection(
+                (self._config.host, 80), timeout=self._config.probe_timeout
+            ):
+                return True
+        except OSError:
             return False
 
     def status(self) -> State:
         """
         Query the device for its current playback status.
 
+        A single playing.php request answers both "is it on?" and "what is
+        it doing?", so no separate power check is made.
+
         Returns:
             State: Current state of the device
         """
-        if not self.get_power_status():
+        reachable, playing = self.fetch_playing()
+        if not reachable:
             return State.OFF
 
-        return self._get_play_status_from_api()
+        return self._parse_play_status(playing)
+
+    def snapshot(self) -> Snapshot:
+        """
+        Gather power, playback state, title and volume in one pass.
+
+        playing.php is fetched exactly once and doubles as the liveness check,
+        so a poll costs one HTTP request plus one UPnP GetVolume call.
+
+        Returns:
+            Snapshot: Current view of the device
+        """
+        reachable, playing = self.fetch_playing()
+        if not reachable:
+            return Snapshot(power=False, state=State.OFF)
+
+        return Snapshot(
+            power=True,
+            state=self._parse_play_status(playing),
+            title=(playing or {}).get("name", ""),
+            volume=self.get_volume(),
+        )
 
     def _get_play_status_from_upnp(self):
         """Uses upnp to get the current play state.
@@ -85,28 +308,50 @@ class Storybutton:
         result in the Storybutton crashing, specifically:
         - When it's trying to update
         """
-        resp = self.upnp_client.AVTransport.GetTransportInfo(InstanceID=0)
+        resp = self._invoke_upnp("AVTransport", "GetTransportInfo", InstanceID=0)
         current_state = resp.get("CurrentTransportState")
 
-        return {"PAUSED_PLAYBACK": State.PAUSED, "PLAYING": State.PLAYING}.get(
-            current_state, State.UNKNOWN
-        )
+        return _STATE_UPNP_MAP.get(current_state, State.UNKNOWN)
 
     def _get_play_status_from_api(self):
         """Gets the current play state from the device's API"""
-        status = self._playing_php_response()
+        return self._parse_play_status(self._playing_php_response())
 
+    @staticmethod
+    def _parse_play_status(status: dict | None) -> State:
+        """Maps a playing.php response to a play state"""
         if not status or status.get("result") == "fail":
             return State.UNKNOWN
 
-        current_status = status.get("chStatus", "").replace("Play state: ", "")
-        return {"paused": State.PAUSED, "playing": State.PLAYING}.get(
-            current_status, State.UNKNOWN
-        )
+        current_status = status.get("chStatus", "").removeprefix("Play state: ")
+        return _STATE_API_MAP.get(current_status, State.UNKNOWN)
 
     def name(self) -> str:
-        """Get the friendly name of the device."""
-        return self.upnp_client.friendly_name
+        """
+        Get the friendly name of the device.
+
+        The name comes from the device description and effectively never
+        changes, so it is cached for `upnp_ttl` seconds. If a refresh fails,
+        the previous name is served instead.
+
+        Returns:
+            str: Friendly name of the device
+        """
+        now = time.monotonic()
+        if (
+            self._cached_name
+            and now - self._name_refreshed_at < self._config.upnp_ttl
+        ):
+            return self._cached_name
+
+        try:
+            self._cached_name = self.upnp_client.friendly_name
+        except requests.exceptions.RequestException:
+            if self._cached_name is None:
+                raise
+            return self._cached_name
+        self._name_refreshed_at = now
+        return self._cached_name
 
     def get_volume(self) -> int:
         """
@@ -118,21 +363,35 @@ class Storybutton:
         Raises:
             Exception: If volume information is not available
         """
-        resp = self.upnp_client.RenderingControl.GetVolume(
-            InstanceID=0, Channel="Master"
+        resp = self._invoke_upnp(
+            "RenderingControl", "GetVolume", InstanceID=0, Channel="Master"
         )
         if "CurrentVolume" not in resp:
             raise Exception("No volume returned from device: ", resp)
 
+        self._last_volume = (time.monotonic(), resp["CurrentVolume"])
         return resp["CurrentVolume"]
 
     def set_volume(self, desired_volume: int) -> None:
-        """Set the volume to a specific level."""
-        self.upnp_client.RenderingControl.SetVolume(
-            InstanceID=0,
-            Channel="Master",
-            DesiredVolume=max(0, min(100, desired_volume)),
+        """
+        Set the volume to a specific level.
+
+        Nothing is sent if the same level was read or sent within the last
+        `repeat_window` seconds, e.g. when the UI repeats a slider value.
+        Older values may be out of date, since the volume can be changed on
+        the device itself.
+        """
+        volume = max(0, min(100, desired_volume))
+        if self._is_repeat(self._last_volume, volume):
+            return
+
+        self._send_soap(
+            "RenderingControl",
+            "SetVolume",
+            _SET_VOLUME_ENVELOPE.format(volume=volume).encode(),
+            _SET_VOLUME_HEADERS,
         )
+        self._last_volume = (time.monotonic(), volume)
 
     def volume_up(self) -> int:
         """
@@ -162,23 +421,37 @@ class Storybutton:
 
     def play(self) -> None:
         """Start playback."""
-        self.upnp_client.AVTransport.Play(InstanceID=0, Speed="1")
+        self._send_soap("AVTransport", "Play", _PLAY_ENVELOPE, _PLAY_HEADERS)
 
     def pause(self) -> None:
         """Pause playback."""
-        self.upnp_client.AVTransport.Pause(InstanceID=0)
+        self._send_soap("AVTransport", "Pause", _PAUSE_ENVELOPE, _PAUSE_HEADERS)
 
     def mute(self) -> None:
-        """Mute the device."""
-        self.upnp_client.RenderingControl.SetMute(
-            InstanceID=0, Channel="Master", DesiredMute="1"
+        """Mute the device, unless it was just muted."""
+        if self._is_repeat(self._last_mute, True):
+            return
+
+        self._send_soap(
+            "RenderingControl",
+            "SetMute",
+            _SET_MUTE_ENVELOPE.format(mute=1).encode(),
+            _SET_MUTE_HEADERS,
         )
+        self._last_mute = (time.monotonic(), True)
 
     def unmute(self) -> None:
-        """Unmute the device."""
-        self.upnp_client.RenderingControl.SetMute(
-            InstanceID=0, Channel="Master", DesiredMute="0"
+        """Unmute the device, unless it was just unmuted."""
+        if self._is_repeat(self._last_mute, False):
+            return
+
+        self._send_soap(
+            "RenderingControl",
+            "SetMute",
+            _SET_MUTE_ENVELOPE.format(mute=0).encode(),
+            _SET_MUTE_HEADERS,
         )
+        self._last_mute = (time.monotonic(), False)
 
     def title(self) -> str:
         """
@@ -187,12 +460,27 @@ class Storybutton:
         Returns:
             str: Title of current content or empty string if unavailable
         """
+        return (self._playing_php_response() or {}).get("name", "")
+
+    def fetch_playing(self) -> tuple[bool, dict | None]:
+        """
+        Fetch the frontend's playing.php API once.
+
+        Unlike `_playing_php_response`, this distinguishes an unreachable
+        device from one that responded with something we can't decode.
+
+        Returns:
+            tuple: Whether the device responded, and the decoded JSON (or None)
+        """
         try:
-            playing_endpoint = f"{self._endpoint}/php/playing.php"
-            resp = self._http_client.get(playing_endpoint)
-            return resp.json().get("name", "")
-        except Exception:
-            return ""
+            resp = self._http_client.get(self._playing_url, timeout=self._timeout)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+            return False, None
+
+        try:
+            return True, orjson.loads(resp.content)
+        except orjson.JSONDecodeError:
+            return True, None
 
     def _playing_php_response(self) -> dict | None:
         """Returns the decoded response from the frontend's playing.php API
@@ -210,8 +498,6 @@ class Storybutton:
             dict: JSON response
         """
         try:
-            playing_endpoint = f"{self._endpoint}/php/playing.php"
-            resp = self._http_client.get(playing_endpoint)
-            return resp.json()
+            return self.fetch_playing()[1]
         except Exception:
             return None
@@ -0,0 +1,294 @@
+import asyncio
+from typing import Tuple
+from unittest.mock import Mock, patch
+
+import pytest
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+from custom_components.storybutton import media_player
+from custom_components.storybutton.media_player import StoryButtonEntity
+from custom_components.storybutton.storybutton import Snapshot, State
+
+
+class FakeBus:
+    """An event bus that only supports one-shot listeners."""
+
+    def __init__(self) -> None:
+        self.listeners: dict[str, list] = {}
+
+    def async_listen_once(self, event_type, listener):
+        self.listeners.setdefault(event_type, []).append(listener)
+        return lambda: None
+
+    def async_fire(self, event_type) -> None:
+        for listener in self.listeners.pop(event_type, []):
+            listener(Mock(event_type=event_type))
+
+
+class FakeHass:
+    """The parts of HomeAssistant the entity uses."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop) -> None:
+        self.loop = loop
+        self.bus = FakeBus()
+
+
+@pytest.fixture
+def mock_device() -> Mock:
+    """Create a mock Storybutton that reports a paused, reachable device."""
+    device = Mock()
+    device.snapshot.return_value = Snapshot(
+        power=True, state=State.PAUSED, title="Test Track", volume=40
+    )
+    device.name.return_value = "Test Device"
+    return device
+
+
+class FakeClock:
+    """A monotonic clock that only moves when told to."""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+def poll_ticks(entity, mock_device: Mock, clock: FakeClock, ticks: int):
+    """Drive `ticks` SCAN_INTERVAL ticks; return the offsets that polled."""
+
+    async def _drive():
+        start, polled = clock.now, []
+        for tick in range(ticks):
+            clock.now = start + tick * media_player.SCAN_INTERVAL.total_seconds()
+            calls = mock_device.snapshot.call_count
+            await entity.async_update()
+            if mock_device.snapshot.call_count > calls:
+                polled.append(tick * 5)
+        return polled
+
+    return _drive()
+
+
+def slow_snapshot(clock: FakeClock, snapshot: Snapshot, duration: float = 0.3):
+    """Snapshot side effect that takes `duration` seconds of fake time."""
+
+    def _snapshot():
+        clock.now += duration
+        return snapshot
+
+    return _snapshot
+
+
+def run(coro_factory, mock_device: Mock, name: str | None = "Storybutton"):
+    """Run `coro_factory(entity)` on a fresh loop with a mocked device client."""
+
+    async def _run() -> Tuple[StoryButtonEntity, object]:
+        entity = StoryButtonEntity(FakeHass(asyncio.get_running_loop()), "host", name)
+        with patch.object(media_player, "Storybutton", return_value=mock_device):
+            result = await coro_factory(entity)
+        await entity.async_will_remove_from_hass()
+        return entity, result
+
+    return asyncio.run(_run())
+
+
+class TestStoryButtonEntity:
+    def test_update(self, mock_device):
+        """Test a poll applies the snapshot."""
+        entity, _ = run(lambda e: e.async_update(), mock_device)
+
+        assert entity.state == "paused"
+        assert entity.media_title == "Test Track"
+        assert entity.volume_level == 0.4
+
+    def test_readded_after_removal(self, mock_device):
+        """Test the entity keeps working when HA removes and re-adds it."""
+
+        async def rename(entity):
+            await entity.async_update()
+            await entity.async_added_to_hass()
+            # What HA does when the entity_id is changed in the registry
+            await entity.async_will_remove_from_hass()
+            await entity.async_added_to_hass()
+            await entity.async_media_play()
+            entity._next_poll_at = entity._last_command_at = 0
+            await entity.async_update()
+
+        entity, _ = run(rename, mock_device)
+
+        mock_device.play.assert_called_once()
+        assert mock_device.snapshot.call_count == 2
+        assert entity.state == "paused"
+
+    def test_worker_stopped_on_removal(self, mock_device):
+        """Test removal shuts the worker down."""
+
+        async def add_and_remove(entity):
+            await entity.async_update()
+            executor = entity._executor
+            await entity.async_will_remove_from_hass()
+            return executor
+
+        entity, executor = run(add_and_remove, mock_device)
+
+        assert entity._executor is None
+        assert executor._shutdown
+
+    def test_worker_stopped_on_ha_stop(self, mock_device):
+        """Test the worker exits when HA stops, which doesn't remove entities."""
+
+        async def add_and_stop(entity):
+            await entity.async_update()
+            await entity.async_added_to_hass()
+            (worker,) = entity._executor._threads
+            entity.hass.bus.async_fire(EVENT_HOMEASSISTANT_STOP)
+            # Checked before `run` removes the entity, which would stop it too
+            await asyncio.to_thread(worker.join, 2)
+            return worker.is_alive(), entity._executor
+
+        _, (alive, executor) = run(add_and_stop, mock_device)
+
+        assert not alive
+        assert executor is None
+
+    def test_name_resolved_on_first_poll(self, mock_device):
+        """Test an unnamed entity gets the device name before it is added."""
+
+        async def poll_twice(entity):
+            await entity.async_update()
+            entity._next_poll_at = 0
+            await entity.async_update()
+
+        entity, _ = run(poll_twice, mock_device, name=None)
+
+        assert entity.name == "Test Device"
+        mock_device.name.assert_called_once()
+
+    def test_name_retried_while_unreachable(self, mock_device):
+        """Test the name lookup waits for a reachable device."""
+        mock_device.snapshot.return_value = Snapshot(power=False, state=State.OFF)
+
+        entity, _ = run(lambda e: e.async_update(), mock_device, name=None)
+
+        assert entity.name is None
+        mock_device.name.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "snapshot,expected",
+        [
+            (Snapshot(True, State.PLAYING, "", 40), [0, 5, 10, 15, 20, 25, 30, 35]),
+            (Snapshot(True, State.PAUSED, "", 40), [0, 10, 20, 30]),
+            # Backoff: 20s, 40s, ... after each failed poll
+            (Snapshot(False, State.OFF), [0, 20]),
+        ],
+    )
+    def test_poll_cadence(self, mock_device, snapshot, expected):
+        """Test polls follow the state-dependent interval on HA's 5s tick."""
+        clock = FakeClock()
+        mock_device.snapshot.side_effect = slow_snapshot(clock, snapshot)
+
+        with patch.object(media_player, "time", clock):
+            _, polled = run(
+                lambda e: poll_ticks(e, mock_device, clock, 8), mock_device
+            )
+
+        assert polled == expected
+
+    def test_backoff_capped_and_reset(self, mock_device):
+        """Test the offline backoff is capped and resets once reachable."""
+        clock = FakeClock()
+
+        async def scenario(entity):
+            mock_device.snapshot.return_value = Snapshot(False, State.OFF)
+            for _ in range(10):
+                entity._next_poll_at = 0
+                await entity.async_update()
+            capped = entity._poll_interval
+
+            mock_device.snapshot.return_value = Snapshot(
+                True, State.PLAYING, "", 40
+            )
+            entity._next_poll_at = 0
+            await entity.async_update()
+            return capped, entity._poll_interval
+
+        with patch.object(media_player, "time", clock):
+            _, (capped, reset) = run(scenario, mock_device)
+
+        assert capped == media_player.POLL_INTERVAL_MAX
+        assert reset == media_player.POLL_INTERVAL_PLAYING
+
+    def test_command_resets_backoff(self, mock_device):
+        """Test a successful command ends the offline backoff."""
+        clock = FakeClock()
+
+        async def scenario(entity):
+            mock_device.snapshot.return_value = Snapshot(False, State.OFF)
+            for _ in range(10):
+                entity._next_poll_at = 0
+                await entity.async_update()
+            backed_off = entity._poll_interval
+
+            # The device is back and the user presses Play
+            mock_device.snapshot.return_value = Snapshot(
+                True, State.PLAYING, "", 40
+            )
+            await entity.async_media_play()
+            clock.now += media_player.COMMAND_SETTLE_TIME
+            await entity.async_update()
+            return backed_off
+
+        with patch.object(media_player, "time", clock):
+            entity, backed_off = run(scenario, mock_device)
+
+        assert backed_off == media_player.POLL_INTERVAL_MAX
+        assert mock_device.snapshot.call_count == 11
+        assert entity._poll_interval == media_player.POLL_INTERVAL_PLAYING
+        assert entity.state == "playing"
+
+    def test_command_settle_window(self, mock_device):
+        """Test polls keep the optimistic state right after a command."""
+        clock = FakeClock()
+
+        async def scenario(entity):
+            await entity.async_update()
+            await entity.async_media_play()
+            entity._next_poll_at = 0
+            await entity.async_update()
+            settling = (entity.state, mock_device.snapshot.call_count)
+
+            clock.now += media_player.COMMAND_SETTLE_TIME
+            await entity.async_update()
+            return settling
+
+        with patch.object(media_player, "time", clock):
+            entity, settling = run(scenario, mock_device)
+
+        assert settling == ("playing", 1)
+        assert entity.state == "paused"
+        assert mock_device.snapshot.call_count == 2
+
+    def test_poll_overlapping_command_discarded(self, mock_device):
+        """Test a poll that was in flight when a command was sent is dropped."""
+        clock = FakeClock()
+        entities = []
+
+        def snapshot():
+            # The command lands while the device is being read
+            clock.now += 1
+            entities[0]._last_command_at = clock.now
+            return Snapshot(True, State.PAUSED, "", 40)
+
+        mock_device.snapshot.side_effect = snapshot
+
+        async def scenario(entity):
+            entities.append(entity)
+            entity._state = "playing"
+            await entity.async_update()
+
+        with patch.object(media_player, "time", clock):
+            entity, _ = run(scenario, mock_device)
+
+        assert entity.state == "playing"
+        assert entity.media_title == ""
@@ -1,6 +1,7 @@
 from typing import Tuple
-from unittest.mock import Mock, create_autospec
+from unittest.mock import MagicMock, Mock, create_autospec, patch
 
+import orjson
 import pytest
 import requests
 import upnpclient
@@ -11,6 +12,15 @@ from custom_components.storybutton.storybutton import (
     StorybuttonConfig,
 )
 
+RENDERING_CONTROL_URL = "http://test-host/upnp/control/rendercontrol1"
+AV_TRANSPORT_URL = "http://test-host/upnp/control/avtransport1"
+
+
+def posted_soap(mock_session: Mock) -> Tuple[str, str, str]:
+    """Return the URL, SOAPAction header and body of the last SOAP POST."""
+    args, kwargs = mock_session.post.call_args
+    return args[0], kwargs["headers"]["SOAPAction"], kwargs["data"].decode()
+
 
 @pytest.fixture
 def mock_upnp() -> Mock:
@@ -20,12 +30,16 @@ def mock_upnp() -> Mock:
     # Set up RenderingControl service
     mock.RenderingControl = Mock()
     mock.RenderingControl.GetVolume.return_value = {"CurrentVolume": 50}
+    mock.RenderingControl.SetVolume.url = RENDERING_CONTROL_URL
+    mock.RenderingControl.SetMute.url = RENDERING_CONTROL_URL
 
     # Set up AVTransport service
     mock.AVTransport = Mock()
     mock.AVTransport.GetTransportInfo.return_value = {
         "CurrentTransportState": "PLAYING"
     }
+    mock.AVTransport.Play.url = AV_TRANSPORT_URL
+    mock.AVTransport.Pause.url = AV_TRANSPORT_URL
 
     # Set friendly name
     mock.friendly_name = "Test Device"
@@ -63,23 +77,44 @@ class TestStorybutton:
         button = Storybutton(config)
 
         assert button._endpoint == "http://test-host"
+        assert button._playing_url == "http://test-host/php/playing.php"
+        assert button._device_xml_url == "http://test-host/device.xml"
         assert button._upnp_client is None
         assert button._config.request_timeout == 3  # default value
+        assert button._config.connect_timeout == 1.0  # default value
+
+    def test_default_http_client_is_pooled(self):
+        """Test each config gets its own keep-alive session with a sized pool."""
+        first = StorybuttonConfig(host="test-host")
+        second = StorybuttonConfig(host="other-host")
+
+        assert first.http_client is not second.http_client
+        adapter = first.http_client.get_adapter("http://test-host")
+        assert adapter._pool_maxsize == 2
+        assert adapter.max_retries.total == 1
+        assert first.http_client.headers["Connection"] == "keep-alive"
 
     def test_get_power_status_online(self, storybutton):
         """Test power status when device is online."""
         button, _, mock_session = storybutton
-        mock_session.get.return_value = Mock(status_code=200)
 
-        assert button.get_power_status() is True
-        mock_session.get.assert_called_once_with("http://test-host", timeout=3)
+        with patch(
+            "custom_components.storybutton.storybutton.socket.create_connection",
+            return_value=MagicMock(),
+        ) as mock_connect:
+            assert button.get_power_status() is True
+        mock_connect.assert_called_once_with(("test-host", 80), timeout=0.5)
+        mock_session.get.assert_not_called()
 
     def test_get_power_status_offline(self, storybutton):
         """Test power status when device is offline."""
-        button, _, mock_session = storybutton
-        mock_session.get.side_effect = requests.exceptions.Timeout()
+        button, _, _ = storybutton
 
-        assert button.get_power_status() is False
+        with patch(
+            "custom_components.storybutton.storybutton.socket.create_connection",
+            side_effect=TimeoutError(),
+        ):
+            assert button.get_power_status() is False
 
     def test_status_device_off(self, storybutton):
         """Test status when device is powered off."""
@@ -106,16 +141,22 @@ class TestStorybutton:
         mock_session.get.return_value = Mock(status_code=200)
 
         # Configure transport state
-        mock_session.get.return_value.json.return_value = {
-            "chStatus": f"Play state: {transport_state}",
-            "result": "success",
-        }
+        mock_session.get.return_value.content = orjson.dumps(
+            {
+                "chStatus": f"Play state: {transport_state}",
+                "result": "success",
+            }
+        )
 
         assert button.status() == expected_state
+        # playing.php doubles as the power check
+        mock_session.get.assert_called_once_with(
+            "http://test-host/php/playing.php", timeout=(1.0, 3)
+        )
 
     def test_volume_controls(self, storybutton):
         """Test volume control functions."""
-        button, mock_upnp, _ = storybutton
+        button, mock_upnp, mock_session = storybutton
 
         # Test get_volume
         mock_upnp.RenderingControl.GetVolume.return_value = {"CurrentVolume": 50}
@@ -124,80 +165,118 @@ class TestStorybutton:
         # Test volume_up
         new_volume = button.volume_up()
         assert new_volume == 51
-        mock_upnp.RenderingControl.SetVolume.assert_called_with(
-            InstanceID=0, Channel="Master", DesiredVolume=51
-        )
+        url, action, body = posted_soap(mock_session)
+        assert url == RENDERING_CONTROL_URL
+        assert action == '"urn:schemas-upnp-org:service:RenderingControl:1#SetVolume"'
+        assert "<Channel>Master</Channel><DesiredVolume>51</DesiredVolume>" in body
 
         # Test volume_down
         mock_upnp.RenderingControl.GetVolume.return_value = {"CurrentVolume": 51}
         new_volume = button.volume_down()
         assert new_volume == 50
-        mock_upnp.RenderingControl.SetVolume.assert_called_with(
-            InstanceID=0, Channel="Master", DesiredVolume=50
-        )
+        assert "<DesiredVolume>50</DesiredVolume>" in posted_soap(mock_session)[2]
 
     def test_volume_limits(self, storybutton):
         """Test volume limits (0-100)."""
-        button, mock_upnp, _ = storybutton
+        button, mock_upnp, mock_session = storybutton
 
         # Test upper limit
         mock_upnp.RenderingControl.GetVolume.return_value = {"CurrentVolume": 100}
         assert button.volume_up() == 100
-        mock_upnp.RenderingControl.SetVolume.assert_not_called()
+        mock_session.post.assert_not_called()
 
         # Test lower limit
         mock_upnp.RenderingControl.GetVolume.return_value = {"CurrentVolume": 0}
         assert button.volume_down() == 0
-        mock_upnp.RenderingControl.SetVolume.assert_not_called()
+        mock_session.post.assert_not_called()
 
     def test_set_volume_limits(self, storybutton):
         """Test set_volume respects limits."""
-        button, mock_upnp, _ = storybutton
+        button, _, mock_session = storybutton
 
         # Test above max
         button.set_volume(150)
-        mock_upnp.RenderingControl.SetVolume.assert_called_with(
-            InstanceID=0, Channel="Master", DesiredVolume=100
-        )
+        assert "<DesiredVolume>100</DesiredVolume>" in posted_soap(mock_session)[2]
 
         # Test below min
         button.set_volume(-10)
-        mock_upnp.RenderingControl.SetVolume.assert_called_with(
-            InstanceID=0, Channel="Master", DesiredVolume=0
-        )
+        assert "<DesiredVolume>0</DesiredVolume>" in posted_soap(mock_session)[2]
+
+    def test_set_volume_skips_repeats(self, storybutton):
+        """Test set_volume doesn't resend a level it just read or sent."""
+        button, _, mock_session = storybutton
+
+        button.set_volume(30)
+        button.set_volume(30)
+        assert mock_session.post.call_count == 1
+
+        # The level just reported by the device counts as known, too
+        assert button.get_volume() == 50
+        button.set_volume(50)
+        assert mock_session.post.call_count == 1
+
+        button.set_volume(31)
+        assert mock_session.post.call_count == 2
+
+    def test_set_volume_resends_after_window(self, storybutton):
+        """Test an older known level is resent, as it may have changed since."""
+        button, _, mock_session = storybutton
+
+        button.set_volume(30)
+        seen_at, volume = button._last_volume
+        button._last_volume = (seen_at - button._config.repeat_window, volume)
+        button.set_volume(30)
+        assert mock_session.post.call_count == 2
 
     def test_playback_controls(self, storybutton):
         """Test playback control functions."""
-        button, mock_upnp, _ = storybutton
+        button, _, mock_session = storybutton
 
         button.play()
-        mock_upnp.AVTransport.Play.assert_called_with(InstanceID=0, Speed="1")
+        url, action, body = posted_soap(mock_session)
+        assert url == AV_TRANSPORT_URL
+        assert action == '"urn:schemas-upnp-org:service:AVTransport:1#Play"'
+        assert "<InstanceID>0</InstanceID><Speed>1</Speed>" in body
 
         button.pause()
-        mock_upnp.AVTransport.Pause.assert_called_with(InstanceID=0)
+        url, action, body = posted_soap(mock_session)
+        assert url == AV_TRANSPORT_URL
+        assert action == '"urn:schemas-upnp-org:service:AVTransport:1#Pause"'
+        assert "<u:Pause" in body
 
     def test_mute_controls(self, storybutton):
         """Test mute control functions."""
-        button, mock_upnp, _ = storybutton
+        button, _, mock_session = storybutton
 
         button.mute()
-        mock_upnp.RenderingControl.SetMute.assert_called_with(
-            InstanceID=0, Channel="Master", DesiredMute="1"
-        )
+        url, action, body = posted_soap(mock_session)
+        assert url == RENDERING_CONTROL_URL
+        assert action == '"urn:schemas-upnp-org:service:RenderingControl:1#SetMute"'
+        assert "<DesiredMute>1</DesiredMute>" in body
 
         button.unmute()
-        mock_upnp.RenderingControl.SetMute.assert_called_with(
-            InstanceID=0, Channel="Master", DesiredMute="0"
-        )
+        assert "<DesiredMute>0</DesiredMute>" in posted_soap(mock_session)[2]
+
+        # Repeating the mute state right away is a no-op
+        button.unmute()
+        assert mock_session.post.call_count == 2
+
+        # ...but not once it may have been changed on the device
+        seen_at, muted = button._last_mute
+        button._last_mute = (seen_at - button._config.repeat_window, muted)
+        button.unmute()
+        assert mock_session.post.call_count == 3
 
     def test_title(self, storybutton):
         """Test title retrieval."""
         button, _, mock_session = storybutton
 
         # Test successful title retrieval
-        mock_session.get.return_value.json.return_value = {"name": "Test Track"}
+        mock_session.get.return_value.content = orjson.dumps({"name": "Test Track"})
         assert button.title() == "Test Track"
-        mock_session.get.assert_called_with("http://test-host/php/playing.php")
+        mock_session.get.assert_called_with(
+            "http://test-host/php/playing.php", timeout=(1.0, 3)
+        )
 
         # Test failed title retrieval
         mock_session.get.side_effect = Exception()
@@ -217,3 +296,103 @@ class TestStorybutton:
         button, mock_upnp, _ = storybutton
         mock_upnp.friendly_name = "Test Storybutton"
         assert button.name() == "Test Storybutton"
+
+    def test_fetch_playing(self, storybutton):
+        """Test playing.php is fetched once and reachability is reported."""
+        button, _, mock_session = storybutton
+        mock_session.get.return_value.content = orjson.dumps({"name": "Test Track"})
+
+        assert button.fetch_playing() == (True, {"name": "Test Track"})
+        mock_session.get.assert_called_once_with(
+            "http://test-host/php/playing.php", timeout=(1.0, 3)
+        )
+
+        mock_session.get.return_value.content = b"<html>not json</html>"
+        assert button.fetch_playing() == (True, None)
+
+        mock_session.get.side_effect = requests.exceptions.ConnectionError()
+        assert button.fetch_playing() == (False, None)
+
+    def test_snapshot(self, storybutton):
+        """Test snapshot issues a single HTTP request plus GetVolume."""
+        button, mock_upnp, mock_session = storybutton
+        mock_session.get.return_value.content = orjson.dumps(
+            {
+                "name": "Test Track",
+                "chStatus": "Play state: playing",
+                "result": "success",
+            }
+        )
+
+        snapshot = button.snapshot()
+        assert snapshot.power is True
+        assert snapshot.state == State.PLAYING
+        assert snapshot.title == "Test Track"
+        assert snapshot.volume == 50
+        mock_session.get.assert_called_once()
+        mock_upnp.RenderingControl.GetVolume.assert_called_once()
+
+    def test_snapshot_device_off(self, storybutton):
+        """Test snapshot skips UPnP when the device is unreachable."""
+        button, mock_upnp, mock_session = storybutton
+        mock_session.get.side_effect = requests.exceptions.Timeout()
+
+        snapshot = button.snapshot()
+        assert snapshot.power is False
+        assert snapshot.state == State.OFF
+        mock_upnp.RenderingControl.GetVolume.assert_not_called()
+
+    def test_upnp_client_cached_until_ttl(self, mock_upnp, mock_session):
+        """Test the UPnP client is reused until its TTL expires."""
+        factory = Mock(return_value=mock_upnp)
+        config = StorybuttonConfig(
+            host="test-host", http_client=mock_session, upnp_factory=factory
+        )
+        button = Storybutton(config)
+
+        button.get_volume()
+        button.get_volume()
+        factory.assert_called_once_with("http://test-host/device.xml")
+
+        button._upnp_created_at -= config.upnp_ttl + 1
+        button.get_volume()
+        assert factory.call_count == 2
+
+    def test_upnp_client_dropped_on_failure(self, storybutton):
+        """Test a failed UPnP call invalidates the cached client."""
+        button, mock_upnp, mock_session = storybutton
+        mock_upnp.RenderingControl.GetVolume.side_effect = (
+            requests.exceptions.ConnectionError()
+        )
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            button.get_volume()
+        assert button._upnp_client is None
+
+        button.play()
+        assert button._control_urls == {"Play": AV_TRANSPORT_URL}
+        mock_session.post.side_effect = requests.exceptions.ConnectionError()
+        with pytest.raises(requests.exceptions.ConnectionError):
+            button.play()
+        assert button._upnp_client is None
+        assert button._control_urls == {}
+
+    def test_control_url_cached(self, storybutton):
+        """Test control URLs are looked up once per action."""
+        button, mock_upnp, mock_session = storybutton
+
+        button.play()
+        mock_upnp.AVTransport.Play.url = "http://elsewhere/control"
+        button.play()
+        assert posted_soap(mock_session)[0] == AV_TRANSPORT_URL
+
+    def test_name_cached(self, storybutton):
+        """Test the friendly name is served from cache until the TTL expires."""
+        button, mock_upnp, _ = storybutton
+        assert button.name() == "Test Device"
+
+        mock_upnp.friendly_name = "Renamed Device"
+        assert button.name() == "Test Device"
+
+        button._name_refreshed_at -= button._config.upnp_ttl + 1
+        assert button.name() == "Renamed Device"